@@ -14,321 +14,500 @@ Usage:
 """
 
 import argparse
-import base64
+import concurrent.futures
+import string
+import struct
+import subprocess
 import sys
-import termios
+import tempfile
+import threading
 import time
+from pathlib import Path
 
 import serial
 import serial.tools.list_ports
 
-BAUD = 115200
+BAUD = 115200  # REPL UART rate after a hard reset
+FAST_BAUD = 921600  # CH340 max; opt-in via --baud, used only for the upload
 CH340_VID_PID = (0x1A86, 0x7523)
 DST = "/main.py"
 CHUNK_SIZE = 256
-
-MAIN_PY = """\
-# micropython
-\"\"\"
-CactusCon14 Badge - Main Entry Point (Modded)
-
-Patches all 15 characters to max stats, max level/XP,
-unlocks all achievement-gated characters, and adds all to player pack.
-\"\"\"
-
-from cactuscon.utils import mem_info, Logger
-
-import asyncio
-from cactuscon.application import BadgeApplication
-from config import BadgeConfig
-
-config = BadgeConfig()
-logger = Logger(config.LOG_LEVEL)
-
-ALL_CIDS = [
-    'hacktarchu', 'hackachu', 'hackachimon',
-    'voltiny', 'voltqueen', 'voltreign',
-    'cinderlet', 'cinderserp', 'cindervipe',
-    'blipbat', 'glyphbat', 'runewing',
-    'cipherkit', 'enigmox', 'cryptilox',
+WRITE_BLOCK = 4096  # must be a multiple of CHUNK_SIZE
+RECV_TIMEOUT_MS = 5000  # badge gives up if the next byte of a requested chunk is this late
+RAW_REPL_PROMPT = b"raw REPL; CTRL-B to exit\r\n>"
+RAW_PASTE_WINDOW = struct.Struct("<H")  # flow-control window size sent after b"R\x01"
+
+# Precompiled payload lives next to a stub main.py, since MicroPython only
+# auto-runs main.py and prefers .py over .mpy on import
+MPY_MODULE = "modded_main"
+MPY_DST = f"/{MPY_MODULE}.mpy"
+MAIN_STUB = f"import {MPY_MODULE}\n{MPY_MODULE}.main()\n"
+# Header of the .mpy files in the firmware dump: v6, bytecode-only, 31-bit small ints
+FIRMWARE_MPY_HEADER = b"M\x06\x00\x1f"
+
+# Run on the badge after the patched boot: sends /patch.log (only present if
+# the patch hit errors), then NVS spot-checks
+VERIFY_SCRIPT = [
+    "import sys",
+    "try:",
+    "    f = open('/patch.log', 'rb')",
+    "    d = f.read()",
+    "    f.close()",
+    "except Exception as e:",
+    "    d = b''",
+    "    print('PATCHLOG_ERR:' + str(e))",
+    # Length-prefixed and written uncooked, so the host reads it back verbatim
+    "print('LOGLEN:' + str(len(d)))",
+    "sys.stdout.buffer.write(d)",
+    "print('LOGEND')",
+    "from cactuscon.prefs import prefs, make_key",
+    "prefs.begin('write', False, context='v')",
+    "a = prefs.get_string('ach', '')",
+    "pl = prefs.get_int32(make_key('pl', 'lvl'), -1)",
+    "sw = prefs.get_int32(make_key('st', 'win'), -1)",
+    "ws = prefs.get_int32('ws', -1)",
+    "prefs.end()",
+    "print('ACH_CT:' + str(len(a.split(','))))",
+    "print('PL_LVL:' + str(pl))",
+    "print('ST_WIN:' + str(sw))",
+    "print('WS:' + str(ws))",
+    "print('VDONE')",
 ]
 
-FINAL_CIDS = [
-    'hackachimon', 'voltreign', 'cindervipe', 'runewing', 'cryptilox',
-]
+# Payload template; feature toggles are $-placeholders filled in by load_main_py()
+MAIN_TEMPLATE = Path(__file__).resolve().parent / "modded_firmware" / "main.py.tmpl"
 
-ALL_ACHS = [
-    'first_battle', 'clean_care', 'collector',
-    'win_streak_3', 'loss_streak_3',
-    'tough_love', 'sweet_tooth', 'temper_max',
-    'focus', 'rage', 'work_play',
-    'sao_unlock_hackachu', 'sao_unlock_enigmox', 'sao_unlock_glyphbat',
-]
 
-NVS_NAMESPACES = ['cactuscon', 'write']
+_log_prefix = threading.local()
 
-ENABLE_RAINBOW = False
-ENABLE_AUTO_BATTLE = False
-ENABLE_MAX_STATS = False
 
+def log(msg=""):
+    """print() that tags each line with the current thread's badge port, if any."""
+    prefix = getattr(_log_prefix, "value", "")
+    if prefix:
+        msg = "\n".join(prefix + line for line in msg.split("\n"))
+    print(msg)
 
-def _patch_stats():
-    log = open('/patch.log', 'w')
 
-    # 1) Patch in-memory base_stats
-    try:
-        from cactuscon.game.engine import characters
-        reg = characters.get_character_registry()
-        chars = reg.all()
-        log.write('found {} chars\\n'.format(len(chars)))
-        for c in chars:
-            c.base_stats.level = 255
-            if ENABLE_MAX_STATS:
-                c.base_stats.hp = 255
-                c.base_stats.max_hp = 255
-                c.base_stats.attack = 99
-                c.base_stats.defense = 99
-                c.base_stats.sp_attack = 99
-                c.base_stats.sp_defense = 99
-                c.base_stats.speed = 99
-        log.write('stats ok\\n')
-    except Exception as e:
-        log.write('stats err: {}\\n'.format(e))
+def load_main_py(rainbow, auto_battle, max_stats):
+    """Read the payload template and fill in the feature toggles.
 
-    # 2-4) Write to both NVS namespaces so game finds values
-    # regardless of which namespace it reads from
-    from cactuscon.prefs import prefs, make_key
-    for ns in NVS_NAMESPACES:
-        try:
-            prefs.begin(ns, True, context="patch_" + ns)
-            try:
-                # Creature level/XP
-                for cid in ALL_CIDS:
-                    prefs.set_int32(make_key("cl", cid), 255)
-                    prefs.set_int32(make_key("cx", cid), 999999)
-
-                # Player stats
-                prefs.set_int32(make_key("pl", "xp"), 999999)
-                prefs.set_int32(make_key("pl", "lvl"), 99)
-                prefs.set_int32(make_key("pl", "win"), 999)
-                prefs.set_int32(make_key("pl", "loss"), 0)
-
-                # Station battle stats
-                prefs.set_int32(make_key("st", "win"), 999)
-                prefs.set_int32(make_key("st", "loss"), 0)
-                prefs.set_int32(make_key("st", "ch"), 999)
-
-                # Streaks
-                prefs.set_int32("ws", 99)
-                prefs.set_int32("ls", 0)
-                prefs.set_int32("ccs", 99)
-
-                # All achievements
-                prefs.set_string("ach", ",".join(ALL_ACHS))
-
-                # Pack (final-form only so evolving doesn't reset level)
-                prefs.set_string(make_key("pc", "chars"), ",".join(FINAL_CIDS))
-            finally:
-                prefs.end()
-            log.write(ns + ' ok\\n')
-        except Exception as e:
-            log.write(ns + ' err: {}\\n'.format(e))
-
-    log.close()
-
-
-def _patch_menu():
-    from cactuscon.ui.graphics import GameUI
-    _orig_set_pixels = GameUI.set_pixels_controller
-    def _patched_set_pixels(self, pc):
-        _orig_set_pixels(self, pc)
-        if ENABLE_RAINBOW:
-            pc.start_rainbow()
-    GameUI.set_pixels_controller = _patched_set_pixels
-
-    from cactuscon.ui.panels.main_menu import MainMenuPanel
-    _orig_create_ui = MainMenuPanel.create_ui
-    def _patched_create_ui(self):
-        _orig_create_ui(self)
-        sub = self.ui_elements.get('subtitle')
-        if sub:
-            sub.set_text('hacked by ed')
-    MainMenuPanel.create_ui = _patched_create_ui
-
-    from cactuscon.ui.panels.character import CharacterPanel
-    _orig_apply = CharacterPanel._apply_character_data
-    def _patched_apply(self):
-        _orig_apply(self)
-        xp_label = self.ui_elements.get('xp_label')
-        if xp_label:
-            xp_label.set_text('HACKED by ED 6/7')
-    CharacterPanel._apply_character_data = _patched_apply
+    The patch version is unique per flash run, so the first boot after a
+    flash always rewrites NVS even if an earlier payload left its marker.
+    """
+    template = string.Template(MAIN_TEMPLATE.read_text(encoding="utf-8"))
+    return template.substitute(
+        rainbow=rainbow,
+        auto_battle=auto_battle,
+        max_stats=max_stats,
+        patch_ver=f"{int(time.time()):x}",
+    )
 
 
-def main():
-    app = BadgeApplication()
-    if ENABLE_AUTO_BATTLE:
-        app.auto_test_enabled = True
-    _patch_stats()
-    _patch_menu()
+def compile_mpy(source):
+    """Cross-compile source with mpy-cross, or return None if unusable."""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / f"{MPY_MODULE}.py"
+        out = src.with_suffix(".mpy")
+        src.write_text(source, encoding="utf-8")
+        try:
+            proc = subprocess.run(
+                ["mpy-cross", "-O3", "-s", src.name, "-o", str(out), str(src)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+        except FileNotFoundError:
+            return None
+        if proc.returncode != 0:
+            log(f"WARNING: mpy-cross failed, pushing source instead:\n{proc.stdout}")
+            return None
+        data = out.read_bytes()
+    if data[:4] != FIRMWARE_MPY_HEADER:
+        log("WARNING: mpy-cross output doesn't match badge .mpy format, pushing source instead.")
+        return None
+    return data
 
-    try:
-        asyncio.run(app.run())
-    except KeyboardInterrupt:
-        logger.warning("Interrupted by user")
-    except Exception as e:
-        logger.error(f"Fatal error: {e}")
-    finally:
-        app.cleanup()
 
+def find_badge_ports():
+    """List every attached CactusCon badge by CH340 VID:PID in one enumeration."""
+    return [p for p in serial.tools.list_ports.comports() if (p.vid, p.pid) == CH340_VID_PID]
 
-if __name__ == "__main__":
-    main()
-"""
 
+def find_badge_port(matches=None):
+    """Auto-detect a CactusCon badge, prompting if several are attached.
 
-def find_badge_port():
-    """Auto-detect a CactusCon badge by CH340 VID:PID."""
-    ports = serial.tools.list_ports.comports()
-    matches = [p for p in ports if (p.vid, p.pid) == CH340_VID_PID]
+    Pass a list from find_badge_ports() to reuse it instead of re-enumerating.
+    """
+    if matches is None:
+        matches = find_badge_ports()
     if not matches:
         return None
     if len(matches) > 1:
-        print(f"Found {len(matches)} CH340 devices:")
+        log(f"Found {len(matches)} CH340 devices:")
         for i, p in enumerate(matches):
-            print(f"  [{i}] {p.device}  {p.description}")
+            log(f"  [{i}] {p.device}  {p.description}")
         choice = input("Select port number: ").strip()
         return matches[int(choice)].device
     return matches[0].device
 
 
 def wait_for(ser, marker, timeout=5):
-    buf = b""
-    end = time.time() + timeout
-    while time.time() < end:
-        if ser.in_waiting:
-            buf += ser.read(ser.in_waiting)
-            if marker in buf:
-                return buf
-        time.sleep(0.05)
-    return buf
+    """Block until marker arrives or timeout expires; return bytes read.
+
+    timeout bounds the whole wait, not each read, so a badge that keeps
+    printing without ever sending marker still gives up on time. Never
+    reads past the end of marker, so output that follows it is left for
+    the next caller.
+    """
+    buf = bytearray()
+    prev_timeout = ser.timeout
+    deadline = time.monotonic() + timeout
+    try:
+        while not buf.endswith(marker):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # pyserial's timeout is per read(), so shrink it to what's left
+            ser.timeout = remaining
+            # Largest read that can't overshoot: the bytes still needed to
+            # complete the longest partial match at the end of buf
+            need = len(marker)
+            for j in range(min(len(marker) - 1, len(buf)), 0, -1):
+                if buf.endswith(marker[:j]):
+                    need = len(marker) - j
+                    break
+            chunk = ser.read(need)
+            if not chunk:
+                break
+            buf.extend(chunk)
+    finally:
+        ser.timeout = prev_timeout
+    return bytes(buf)
 
 
 def interrupt_and_enter_repl(ser, retries=3):
     """Stop running app and enter raw REPL, with retries."""
+    # Fast path: badge is already idle at the friendly REPL, no Ctrl-C needed.
+    # The probe is a hard 0.1s even while the app is logging, since
+    # wait_for's timeout is an overall deadline; then we interrupt as usual.
+    ser.reset_input_buffer()
+    ser.write(b"\r\n")
+    ser.flush()
+    if wait_for(ser, b"\r\n>>> ", timeout=0.1).endswith(b"\r\n>>> "):
+        log("Badge idle at REPL, entering raw REPL...")
+        ser.write(b"\x01")
+        if wait_for(ser, RAW_REPL_PROMPT, timeout=1).endswith(RAW_REPL_PROMPT):
+            return True
+
     for attempt in range(retries):
-        print(f"Interrupting badge app (attempt {attempt + 1})...")
+        log(f"Interrupting badge app (attempt {attempt + 1})...")
+        # Spaced out so each Ctrl-C lands after the previous handler ran
         for _ in range(5):
             ser.write(b"\x03")
             time.sleep(0.1)
-        time.sleep(0.5)
-        ser.read(ser.in_waiting)
+        wait_for(ser, b">>> ", timeout=0.5)
+        ser.reset_input_buffer()
 
-        print("Entering raw REPL...")
+        log("Entering raw REPL...")
         ser.write(b"\x01")
-        time.sleep(0.3)
-        resp = wait_for(ser, b"raw REPL", timeout=3)
+        resp = wait_for(ser, RAW_REPL_PROMPT, timeout=3)
         if b"raw REPL" in resp:
             return True
-        print("Didn't get raw REPL prompt, retrying...")
+        log("Didn't get raw REPL prompt, retrying...")
         time.sleep(1)
 
-    print("WARNING: could not confirm raw REPL entry. Continuing anyway...")
+    log("WARNING: could not confirm raw REPL entry. Continuing anyway...")
     return True
 
 
-def push_file(ser, data, dest):
-    """Transfer file contents to badge via base64 over raw REPL."""
-    b64 = base64.b64encode(data).decode("ascii")
-    print(f"Pushing {len(data)} bytes ({len(b64)} b64 chars) -> {dest}")
-
-    lines = ["import ubinascii", f"f = open('{dest}', 'wb')"]
-    for i in range(0, len(b64), CHUNK_SIZE):
-        lines.append(f"f.write(ubinascii.a2b_base64('{b64[i:i+CHUNK_SIZE]}'))")
-    lines.append("f.close()")
-    lines.append(f"print('OK wrote {dest}')")
-
-    script = "\r\n".join(lines) + "\r\n"
-    script_bytes = script.encode("utf-8")
-    for i in range(0, len(script_bytes), 128):
-        ser.write(script_bytes[i:i + 128])
-        time.sleep(0.02)
-
+def soft_reboot(ser):
+    """Leave the raw REPL and soft-reboot so boot.py/main.py run normally."""
+    # main.py is skipped if the soft reset is issued from the raw REPL
+    ser.write(b"\x02")
+    wait_for(ser, b">>> ", timeout=1)
+    ser.write(b"\x04")
+    ser.flush()
+
+
+def exec_raw_paste(ser, script):
+    """Send script to the raw REPL using raw-paste mode when supported.
+
+    Falls back to a plain raw REPL paste on firmware without raw-paste.
+    Expects the raw REPL prompt to have been consumed already.
+    """
+    data = script.encode("utf-8")
+    ser.write(b"\x05A\x01")
+    resp = ser.read(2)
+    if resp == b"R\x01":
+        window = RAW_PASTE_WINDOW.unpack(ser.read(2))[0]
+        remain = window
+        i = 0
+        while i < len(data):
+            # Badge sends \x01 each time it frees another window of input
+            while remain == 0 or ser.in_waiting:
+                c = ser.read(1)
+                if c == b"\x01":
+                    remain += window
+                elif c == b"\x04":
+                    ser.write(b"\x04")
+                    return False
+                else:
+                    return False
+            chunk = data[i:i + remain]
+            ser.write(chunk)
+            remain -= len(chunk)
+            i += len(chunk)
+        ser.write(b"\x04")
+        return wait_for(ser, b"\x04", timeout=2).endswith(b"\x04")
+
+    if resp != b"R\x00":
+        # Firmware predates raw-paste and re-sent the raw REPL banner
+        wait_for(ser, RAW_REPL_PROMPT, timeout=2)
+    ser.write(data)
+    ser.flush()
     ser.write(b"\x04")
-    time.sleep(1)
-    resp = wait_for(ser, b"OK wrote", timeout=10)
+    return wait_for(ser, b"OK", timeout=2).endswith(b"OK")
+
+
+def start_script(ser, lines):
+    """Start lines running on the raw REPL; the caller reads the output."""
+    ser.read(ser.in_waiting)
+    return exec_raw_paste(ser, "\r\n".join(lines) + "\r\n")
+
+
+def push_file(ser, data, dest):
+    """Transfer raw file contents to badge over the raw REPL.
+
+    A small receiver script is sent via raw-paste, then the payload is
+    streamed as-is in CHUNK_SIZE blocks, each one requested by the badge
+    with a \x01 byte so its UART buffer never overflows. The badge
+    buffers WRITE_BLOCK bytes between filesystem writes.
+    """
+    log(f"Pushing {len(data)} bytes -> {dest}")
+
+    # Ctrl-C is off while raw bytes stream in, so the receiver must never
+    # be left blocked with it off: stdin.readinto() blocks until its buffer
+    # is full, so each byte is polled for first, with RECV_TIMEOUT_MS to
+    # arrive, and kbd_intr is restored however the loop exits. The data
+    # goes to a temp file that only replaces dest once it is complete, so
+    # a failed push leaves the previous file in place.
+    tmp = dest + ".tmp"
+    script = "\r\n".join([
+        "import sys, os, select, micropython",
+        f"n = {len(data)}",
+        f"f = open('{tmp}', 'wb')",
+        "rd = sys.stdin.buffer.readinto",
+        "p = select.poll()",
+        "p.register(sys.stdin, select.POLLIN)",
+        f"mv = memoryview(bytearray({WRITE_BLOCK}))",
+        "k = 0",
+        "ok = False",
+        "micropython.kbd_intr(-1)",
+        "try:",
+        "    while n:",
+        "        sys.stdout.write('\\x01')",
+        f"        m = min(n, {CHUNK_SIZE})",
+        "        n -= m",
+        "        m += k",
+        "        while k < m:",
+        f"            if not p.poll({RECV_TIMEOUT_MS}):",
+        "                raise OSError('host stalled with ' + str(n + m - k) + ' bytes left')",
+        "            rd(mv[k:k + 1])",
+        "            k += 1",
+        f"        if k == {WRITE_BLOCK} or not n:",
+        "            f.write(mv[:k])",
+        "            k = 0",
+        "    ok = True",
+        "finally:",
+        "    micropython.kbd_intr(3)",
+        "    f.close()",
+        "    if not ok:",
+        f"        os.remove('{tmp}')",
+        # FAT won't rename over an existing file
+        "try:",
+        f"    os.remove('{dest}')",
+        "except OSError:",
+        "    pass",
+        f"os.rename('{tmp}', '{dest}')",
+        f"print('OK wrote {dest}')",
+    ]) + "\r\n"
+    if not exec_raw_paste(ser, script):
+        log("WARNING: badge rejected the receiver script.")
+        return False
+
+    for i in range(0, len(data), CHUNK_SIZE):
+        if not wait_for(ser, b"\x01", timeout=5).endswith(b"\x01"):
+            log(f"WARNING: transfer stalled at byte {i}.")
+            return False
+        ser.write(data[i:i + CHUNK_SIZE])
+    # Consume through the trailing raw REPL prompt so the next command starts clean
+    resp = wait_for(ser, b"\x04>", timeout=10)
 
     if b"OK wrote" in resp:
-        print("Transfer OK.")
+        log("Transfer OK.")
         return True
-    print("WARNING: no confirmation received.")
-    print(resp.decode("utf-8", errors="replace")[-300:])
+    log("WARNING: no confirmation received.")
+    log(resp.decode("utf-8", errors="replace")[-300:])
     return False
 
 
+def open_badge(port):
+    """Open a badge serial port with DTR/RTS deasserted."""
+    # CH340 sometimes rejects config passed to the constructor, so always
+    # configure a closed port and open it with DTR/RTS already deasserted
+    ser = serial.Serial()
+    ser.port = port
+    ser.baudrate = BAUD
+    ser.timeout = 1
+    ser.write_timeout = 5
+    ser.dtr = False
+    ser.rts = False
+    ser.open()
+    return ser
+
+
+# Upload rates a badge already refused this session, so later badges (and
+# --all threads) skip straight to BAUD instead of paying the probe again
+_unusable_bauds = set()
+
+
+def switch_baud(ser, baud):
+    """Move the badge's REPL UART and the host port to baud from the raw REPL.
+
+    Falls back to the current rate if the badge doesn't answer at the new
+    one. Returns the rate in use afterwards.
+    """
+    old = ser.baudrate
+    if baud == old:
+        return old
+    if baud in _unusable_bauds:
+        log(f"Staying at {old} baud ({baud} failed earlier this session).")
+        return old
+    exec_raw_paste(ser, f"import machine\r\nmachine.UART(0, baudrate={baud})\r\n")
+    # A complete reply at the old rate means the UART never moved: on many
+    # ESP32 builds UART0 belongs to the REPL and the call raises instead
+    reply = wait_for(ser, b"\x04>", timeout=0.3)
+    if reply.endswith(b"\x04>"):
+        err = reply[:-2].partition(b"\x04")[2].decode("utf-8", errors="replace").strip()
+        reason = err.splitlines()[-1] if err else "UART rate unchanged"
+        return _baud_refused(baud, old, reason)
+    for rate in (baud, old):
+        ser.baudrate = rate
+        ser.reset_input_buffer()
+        ser.write(b"\x01")
+        if wait_for(ser, RAW_REPL_PROMPT, timeout=1).endswith(RAW_REPL_PROMPT):
+            if rate != baud:
+                return _baud_refused(baud, rate, "no answer at the new rate")
+            return rate
+    log(f"WARNING: lost the raw REPL switching to {baud} baud.")
+    return ser.baudrate
+
+
+def _baud_refused(baud, rate, reason):
+    if baud != BAUD:
+        _unusable_bauds.add(baud)
+    log(f"WARNING: badge can't use {baud} baud ({reason}), staying at {rate}.")
+    return rate
+
+
+def flash_one(port, main_py, mpy_data, baud=BAUD, tag=False):
+    """Push the payload to one badge, verify it, and reboot it. Returns False if the push failed.
+
+    Errors (unplugged badge, write timeout) are logged and reported as a
+    failure for this port, so one bad badge can't abort an --all run.
+    """
+    if tag:
+        _log_prefix.value = f"[{port}] "
+    log(f"Found badge on {port}")
+    ser = None
+    try:
+        ser = open_badge(port)
+        return _flash_open_badge(ser, main_py, mpy_data, baud)
+    except Exception as e:
+        log(f"ERROR: {type(e).__name__}: {e}")
+        return False
+    finally:
+        if ser is not None:
+            ser.close()
+
+
+def _flash_open_badge(ser, main_py, mpy_data, baud):
+    time.sleep(0.2)
+
+    interrupt_and_enter_repl(ser)
+
+    if baud != BAUD:
+        log(f"Uploading at {switch_baud(ser, baud)} baud")
+    if mpy_data is not None:
+        pushed = push_file(ser, mpy_data, MPY_DST) and push_file(ser, MAIN_STUB.encode("utf-8"), DST)
+    else:
+        pushed = push_file(ser, main_py.encode("utf-8"), DST)
+    # Back to the boot-time rate before rebooting, so the badge console
+    # and verify_patch don't depend on the rate surviving a soft reset
+    switch_baud(ser, BAUD)
+    if not pushed:
+        return False
+
+    if verify_patch(ser):
+        log("\nAll checks passed. Badge is maxed out.")
+    else:
+        log("\nSome checks failed. Inspect badge manually.")
+
+    # Final reboot into normal operation
+    soft_reboot(ser)
+    log("Badge rebooting into normal operation.")
+    return True
+
+
+def parse_status(text):
+    """Return the error count from the last STATUS: line, or None."""
+    _, sep, tail = text.rpartition("STATUS:")
+    status = tail.split()
+    if not sep or not status or not status[0].isdigit():
+        return None
+    return int(status[0])
+
+
 def verify_patch(ser):
     """Reboot, wait for patch to run, then read back values."""
-    # Exit raw REPL and soft reboot
-    ser.write(b"\x02")
-    time.sleep(0.2)
-    ser.write(b"\x04")
-    print("Rebooting badge... waiting 12s for patch to run...")
-    time.sleep(12)
+    soft_reboot(ser)
+    log("Rebooting badge... waiting for patch to run...")
+    resp = wait_for(ser, b"PATCH_DONE", timeout=20)
+    if b"PATCH_DONE" not in resp:
+        log("WARNING: no PATCH_DONE marker seen, continuing anyway...")
+    time.sleep(0.2)  # let the rest of the boot output flush
 
     # Re-interrupt and enter REPL
     interrupt_and_enter_repl(ser)
 
-    # Read patch.log
-    ser.read(ser.in_waiting)
-    script = "\r\n".join([
-        "try:",
-        "    f = open('/patch.log', 'r')",
-        "    d = f.read()",
-        "    f.close()",
-        "    print('PATCHLOG:' + d)",
-        "except Exception as e:",
-        "    print('PATCHLOG_ERR:' + str(e))",
-    ]) + "\r\n"
-    ser.write(script.encode("utf-8"))
-    time.sleep(0.1)
-    ser.write(b"\x04")
-    time.sleep(1)
-    resp = wait_for(ser, b">", timeout=5)
-    text = resp.decode("utf-8", errors="replace")
+    # Read patch.log and spot-check a few NVS values in one round-trip
+    if not start_script(ser, VERIFY_SCRIPT):
+        log("Could not run verify script")
+        return False
 
     ok = True
-    if "PATCHLOG:" in text:
-        log_content = text.split("PATCHLOG:")[1].split(">")[0].strip()
-        print(f"\n/patch.log:\n{log_content}")
-        if "err" in log_content.lower():
-            print("ERRORS detected in patch log!")
-            ok = False
+    head = wait_for(ser, b"LOGLEN:", timeout=5)
+    length = wait_for(ser, b"\r\n", timeout=1).strip()
+    if head.endswith(b"LOGLEN:") and b"PATCHLOG_ERR:" not in head and length.isdigit():
+        log_content = ser.read(int(length)).decode("utf-8", errors="replace").strip()
     else:
-        print("Could not read patch.log")
+        log_content = None
+    text = wait_for(ser, b"\x04>", timeout=5).decode("utf-8", errors="replace")
+
+    # The payload prints STATUS: just before PATCH_DONE and only keeps
+    # /patch.log when something failed
+    status = parse_status(resp.decode("utf-8", errors="replace"))
+    if log_content is not None:
+        log(f"\n/patch.log:\n{log_content}")
+        if status is None:
+            status = parse_status(log_content)
+    if status is None:
+        log("No STATUS line from patch!")
+        ok = False
+    elif status != 0:
+        log(f"{status} ERRORS detected in patch log!")
         ok = False
-
-    # Spot-check a few NVS values
-    ser.read(ser.in_waiting)
-    script = "\r\n".join([
-        "from cactuscon.prefs import prefs, make_key",
-        "prefs.begin('write', False, context='v')",
-        "a = prefs.get_string('ach', '')",
-        "pl = prefs.get_int32(make_key('pl', 'lvl'), -1)",
-        "sw = prefs.get_int32(make_key('st', 'win'), -1)",
-        "ws = prefs.get_int32('ws', -1)",
-        "prefs.end()",
-        "print('ACH_CT:' + str(len(a.split(','))))",
-        "print('PL_LVL:' + str(pl))",
-        "print('ST_WIN:' + str(sw))",
-        "print('WS:' + str(ws))",
-        "print('VDONE')",
-    ]) + "\r\n"
-    ser.write(script.encode("utf-8"))
-    time.sleep(0.1)
-    ser.write(b"\x04")
-    time.sleep(1)
-    resp = wait_for(ser, b"VDONE", timeout=5)
-    text = resp.decode("utf-8", errors="replace")
 
     checks = {
         "ACH_CT": ("14", "achievements"),
@@ -338,9 +517,9 @@ def verify_patch(ser):
     }
     for key, (expected, label) in checks.items():
         if f"{key}:{expected}" in text:
-            print(f"  {label}: {expected} OK")
+            log(f"  {label}: {expected} OK")
         else:
-            print(f"  {label}: MISMATCH (expected {expected})")
+            log(f"  {label}: MISMATCH (expected {expected})")
             ok = False
 
     return ok
@@ -352,34 +531,25 @@ def main():
     parser.add_argument("--auto-battle", action="store_true", help="Enable auto-battle on boot")
     parser.add_argument("--max-stats", action="store_true",
         help="Max all combat stats to 99 (breaks PvP consensus)")
+    parser.add_argument("--all", action="store_true",
+        help="Flash every attached badge concurrently instead of picking one")
+    parser.add_argument("--baud", type=int, default=BAUD,
+        help=f"Serial rate for the upload (default: {BAUD}; try {FAST_BAUD}, falls back to {BAUD})")
     args = parser.parse_args()
 
-    port = find_badge_port()
-    if not port:
-        print("No CactusCon badge found. Is it plugged in?")
+    if not MAIN_TEMPLATE.exists():
+        sys.stderr.write(f"error: payload template not found at {MAIN_TEMPLATE}\n")
         sys.exit(1)
 
-    print(f"Found badge on {port}")
-    try:
-        ser = serial.Serial(port, BAUD, timeout=1)
-    except (termios.error, serial.SerialException):
-        # CH340 sometimes rejects initial config; open without settings then apply
-        ser = serial.Serial()
-        ser.port = port
-        ser.baudrate = BAUD
-        ser.timeout = 1
-        ser.dtr = False
-        ser.rts = False
-        ser.open()
-    time.sleep(0.2)
-
-    interrupt_and_enter_repl(ser)
+    if args.all:
+        ports = [p.device for p in find_badge_ports()]
+    else:
+        port = find_badge_port()
+        ports = [port] if port else []
+    if not ports:
+        print("No CactusCon badge found. Is it plugged in?")
+        sys.exit(1)
 
-    main_py = MAIN_PY
-    if args.rainbow:
-        main_py = main_py.replace("ENABLE_RAINBOW = False", "ENABLE_RAINBOW = True", 1)
-    if args.auto_battle:
-        main_py = main_py.replace("ENABLE_AUTO_BATTLE = False", "ENABLE_AUTO_BATTLE = True", 1)
     if args.max_stats:
         print("WARNING: --max-stats sets all combat stats to 99. This WILL break PvP")
         print("battles (consensus hash mismatch -> battle voided). Only useful for")
@@ -387,26 +557,26 @@ def main():
         confirm = input("Continue? [y/N] ").strip().lower()
         if confirm != "y":
             print("Aborted.")
-            ser.close()
             sys.exit(0)
-        main_py = main_py.replace("ENABLE_MAX_STATS = False", "ENABLE_MAX_STATS = True", 1)
-    file_data = main_py.encode("utf-8")
-    if not push_file(ser, file_data, DST):
-        ser.close()
+    main_py = load_main_py(args.rainbow, args.auto_battle, args.max_stats)
+    mpy_data = compile_mpy(main_py)
+
+    if not args.all:
+        if not flash_one(ports[0], main_py, mpy_data, args.baud):
+            sys.exit(1)
+        return
+
+    # Each badge is on its own USB endpoint and the work is all blocking
+    # serial I/O, so one thread per port scales with the badge count
+    print(f"Flashing {len(ports)} badges: {', '.join(ports)}")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ports)) as executor:
+        results = list(executor.map(lambda p: flash_one(p, main_py, mpy_data, args.baud, tag=True), ports))
+    failed = [p for p, ok in zip(ports, results) if not ok]
+    print(f"\n{len(ports) - len(failed)}/{len(ports)} badges flashed.")
+    if failed:
+        print(f"Transfer failed on: {', '.join(failed)}")
         sys.exit(1)
 
-    if verify_patch(ser):
-        print("\nAll checks passed. Badge is maxed out.")
-    else:
-        print("\nSome checks failed. Inspect badge manually.")
-
-    # Final reboot into normal operation
-    ser.write(b"\x02")
-    time.sleep(0.2)
-    ser.write(b"\x04")
-    ser.close()
-    print("Badge rebooting into normal operation.")
-
 
 if __name__ == "__main__":
     main()
@@ -9,13 +9,17 @@ import usys as sys
 import time
 import gc
 import os
+import binascii
+import asyncio
 import network
 from machine import Pin
 import machine
+import micropython
 
 # Load config and initialize logger early (needed for PSRAM logging)
 from cactuscon import config
 from cactuscon.utils import Logger
+from cactuscon.prefs import prefs
 from cactuscon.hw.wifi import (
     load_saved_credentials,
     load_saved_failure_count,
@@ -24,6 +28,8 @@ from cactuscon.hw.wifi import (
 )
 
 logger = Logger(config.LOG_LEVEL)
+_LOG_LEVEL_INFO = 20  # Logger.info() prints when logger.level <= this
+_BANNER = "=" * 50
 
 # ============================================================================
 # PSRAM/SPIRAM INITIALIZATION (Must happen early, before large allocations)
@@ -85,6 +91,13 @@ spi_bus = None
 # LOADER DISPLAY (Normal mode only, no-op in headless)
 _loader_label = None
 _loader_initialized = False
+# Messages requested before init_display() finishes are logged and the
+# latest one is drawn once the panel is up
+_display_ready = asyncio.Event()
+_display_ready_ms = None  # _since_boot_ms() when the panel came up
+_pending_loader_message = "Loading..."
+display = None
+th = None
 
 # ============================================================================
 # OTA CONFIGURATION (Both modes)
@@ -96,69 +109,81 @@ OTA_BASE_FILE_URL = config.get_ota_base_url()
 OTA_MANIFEST_URL = config.get_ota_manifest_url()
 OTA_MANIFEST_RECURSE_HTTP_FS = config.OTA_DEV_RECURSE_HTTP_FS if config.DEVELOPMENT else False
 
-STAT_IDLE = getattr(network, "STAT_IDLE", 0)
-STAT_CONNECTING = getattr(network, "STAT_CONNECTING", 1)
-STAT_WRONG_PASSWORD = getattr(network, "STAT_WRONG_PASSWORD", -3)
-STAT_NO_AP_FOUND = getattr(network, "STAT_NO_AP_FOUND", -2)
-STAT_CONNECT_FAIL = getattr(network, "STAT_CONNECT_FAIL", -1)
-STAT_GOT_IP = getattr(network, "STAT_GOT_IP", 3)
+# Looked up once, per name, so one missing constant doesn't take the others
+# with it. Defaults are the ESP32 port's values (STAT_* codes plus the
+# ESP-IDF WIFI_REASON_* codes it reports failures as).
+STAT_IDLE = getattr(network, "STAT_IDLE", 1000)
+STAT_CONNECTING = getattr(network, "STAT_CONNECTING", 1001)
+STAT_WRONG_PASSWORD = getattr(network, "STAT_WRONG_PASSWORD", 202)
+STAT_NO_AP_FOUND = getattr(network, "STAT_NO_AP_FOUND", 201)
+STAT_CONNECT_FAIL = getattr(network, "STAT_CONNECT_FAIL", 205)
+STAT_GOT_IP = getattr(network, "STAT_GOT_IP", 1010)
+
+# Probe the tick API once and bind it, instead of hasattr() on every call
+try:
+    _ticks_ms = time.ticks_ms
+    _ticks_diff = time.ticks_diff
+except AttributeError:
+    def _ticks_ms():
+        return int(time.time() * 1000)
+
+    def _ticks_diff(a, b):
+        return a - b
 
-_BOOT_START_MS = None
-if hasattr(time, "ticks_ms"):
-    _BOOT_START_MS = time.ticks_ms()
-else:
-    _BOOT_START_MS = int(time.time() * 1000)
+_BOOT_START_MS = _ticks_ms()
 
 
+@micropython.native
 def _since_boot_ms():
-    if hasattr(time, "ticks_ms") and hasattr(time, "ticks_diff"):
-        return time.ticks_diff(time.ticks_ms(), _BOOT_START_MS)
-    return int(time.time() * 1000) - _BOOT_START_MS
+    return _ticks_diff(_ticks_ms(), _BOOT_START_MS)
+
+
+_STATUS_REASONS = {
+    STAT_WRONG_PASSWORD: "wrong_password",
+    STAT_NO_AP_FOUND: "no_ap",
+    STAT_CONNECT_FAIL: "connect_fail",
+    STAT_GOT_IP: "got_ip",
+    STAT_CONNECTING: "connecting",
+    STAT_IDLE: "idle",
+}
 
 
 def _status_reason(status):
-    if status == STAT_WRONG_PASSWORD:
-        return "wrong_password"
-    if status == STAT_NO_AP_FOUND:
-        return "no_ap"
-    if status == STAT_CONNECT_FAIL:
-        return "connect_fail"
-    if status == STAT_GOT_IP:
-        return "got_ip"
-    if status == STAT_CONNECTING:
-        return "connecting"
-    if status == STAT_IDLE:
-        return "idle"
-    return "status_{}".format(status)
-
-
-def _safe_status(wifi):
-    try:
-        return wifi.status()
-    except Exception:
-        return None
+    return _STATUS_REASONS.get(status) or "status_{}".format(status)
+
+
+_PIN_CACHE = {}
+
+
+def _get_pin(num, mode, pull=None):
+    """Return a configured Pin, constructing it only on first use."""
+    key = (num, mode, pull)
+    pin = _PIN_CACHE.get(key)
+    if pin is None:
+        pin = Pin(num, mode) if pull is None else Pin(num, mode, pull)
+        _PIN_CACHE[key] = pin
+    return pin
 
 
-def _safe_ifconfig(wifi):
+def _silent(fn, *args):
+    """Call fn(*args), returning None instead of raising on any error."""
     try:
-        return wifi.ifconfig()
+        return fn(*args)
     except Exception:
         return None
 
 
 def _log_wifi_state(label, wifi, status=None, attempt=None, ssid=None):
+    # Logger.info() only prints at level <= INFO; skip the radio queries
+    # and string building entirely when it would drop the line
+    if logger.level > _LOG_LEVEL_INFO:
+        return
     ts = _since_boot_ms()
-    try:
-        active = wifi.active()
-    except Exception:
-        active = None
-    try:
-        connected = wifi.isconnected()
-    except Exception:
-        connected = None
-    status_val = status if status is not None else _safe_status(wifi)
+    active = _silent(wifi.active)
+    connected = _silent(wifi.isconnected)
+    status_val = status if status is not None else _silent(wifi.status)
     status_reason = _status_reason(status_val) if status_val is not None else "unknown"
-    ifconfig = _safe_ifconfig(wifi)
+    ifconfig = _silent(wifi.ifconfig)
     ip = None
     if ifconfig:
         try:
@@ -172,7 +197,7 @@ def _log_wifi_state(label, wifi, status=None, attempt=None, ssid=None):
         except Exception:
             ifconfig_str = ""
     logger.info(
-        "[OTA-WIFI] t={}ms state={} attempt={} ssid={} active={} connected={} status={} reason={} ip={} ifconfig={}".format(
+        "[OTA-WIFI] t=%dms state=%s attempt=%s ssid=%s active=%s connected=%s status=%s reason=%s ip=%s ifconfig=%s" % (
             ts,
             label,
             attempt,
@@ -187,6 +212,51 @@ def _log_wifi_state(label, wifi, status=None, attempt=None, ssid=None):
     )
 
 
+# NVS "<bssid hex>:<ssid>" of the last AP an OTA connect associated with.
+# Kept in boot.py's own namespace, away from the game state in "cactuscon".
+_CACHE_NS = "boot_cache"
+_CACHED_AP_KEY = "ota_ap"
+
+
+def _load_cached_bssid(ssid):
+    try:
+        prefs.begin(_CACHE_NS)
+        try:
+            entry = prefs.get_string(_CACHED_AP_KEY, "")
+        finally:
+            prefs.end()
+        bssid_hex, _, cached_ssid = entry.partition(":")
+        if bssid_hex and cached_ssid == ssid:
+            return binascii.unhexlify(bssid_hex)
+    except Exception as e:
+        logger.warning(f"[OTA-WIFI] cached BSSID load failed: {e}")
+    return None
+
+
+def _save_cached_bssid(ssid, bssid):
+    """Remember bssid for ssid; bssid=None clears the entry."""
+    try:
+        entry = "{}:{}".format(binascii.hexlify(bssid).decode(), ssid) if bssid else ""
+        prefs.begin(_CACHE_NS, True, context="boot.cache_bssid")
+        try:
+            if prefs.get_string(_CACHED_AP_KEY, "") != entry:
+                prefs.set_string(_CACHED_AP_KEY, entry)
+        finally:
+            prefs.end()
+    except Exception as e:
+        logger.warning(f"[OTA-WIFI] cached BSSID save failed: {e}")
+
+
+def _connected_bssid(wifi, ssid):
+    # Some ports report the associated AP directly; otherwise find it in a
+    # scan, which an OTA boot that skipped the pre-connect scan pays once
+    bssid = _silent(wifi.config, "bssid")
+    if bssid:
+        return bssid
+    found = _scan_for_ssid(wifi, ssid)
+    return found[1] if found else None
+
+
 def _scan_for_ssid(wifi, target_ssid):
     try:
         if hasattr(wifi, "active"):
@@ -208,23 +278,17 @@ def _scan_for_ssid(wifi, target_ssid):
         except Exception:
             ssid = ""
         if ssid == target_ssid:
-            return True
+            # Scan entry: (ssid, bssid, channel, RSSI, security, hidden)
+            return entry
     return False
 
 
 if _HEADLESS_MODE:
-    logger.info("=" * 50)
+    logger.info(_BANNER)
     logger.info("AUTO_BATTLE_MODE - Headless Station/Gym Mode")
     logger.info("Display/LVGL disabled, OTA still active")
-    logger.info("=" * 50)
-    
-else:
-    import lvgl as lv
-    lv.init()
+    logger.info(_BANNER)
 
-    import lcd_bus
-    import ili9341
-    import task_handler
 
 def show_loader(message="Loading..."):
     """Display a centered loading animation with text on full screen (LVGL 9.4).
@@ -235,13 +299,19 @@ def show_loader(message="Loading..."):
     Args:
         message: Status text to display below the hourglass icon
     """
-    global _loader_label, _loader_initialized
+    global _loader_label, _loader_initialized, _pending_loader_message
     
     # Headless mode - just print to console
     if _HEADLESS_MODE:
         logger.info(f"[BOOT] {message}")
         return
     
+    # Display still initializing - remember the message for init_display()
+    if not _display_ready.is_set():
+        logger.info(f"[BOOT] {message}")
+        _pending_loader_message = message
+        return
+    
     try:
         scr = lv.screen_active()
         
@@ -267,67 +337,14 @@ def show_loader(message="Loading..."):
         cont.set_style_border_width(2, 0)
         cont.set_style_radius(50, 0)
         
-        # Draw hourglass outline using line widgets with yellow color
-        p_top_left = [
-            lv.point_precise_t({'x': 140, 'y': 90}),
-            lv.point_precise_t({'x': 180, 'y': 90}),
-        ]
-        line_top1 = lv.line(scr)
-        line_top1.set_points(p_top_left, len(p_top_left))
-        line_top1.set_style_line_color(lv.color_hex(0xFFFF00), 0)
-        line_top1.set_style_line_width(2, 0)
-        
-        p_top_right = [
-            lv.point_precise_t({'x': 180, 'y': 90}),
-            lv.point_precise_t({'x': 160, 'y': 120}),
-        ]
-        line_top2 = lv.line(scr)
-        line_top2.set_points(p_top_right, len(p_top_right))
-        line_top2.set_style_line_color(lv.color_hex(0xFFFF00), 0)
-        line_top2.set_style_line_width(2, 0)
-        
-        p_top_close = [
-            lv.point_precise_t({'x': 160, 'y': 120}),
-            lv.point_precise_t({'x': 140, 'y': 90}),
-        ]
-        line_top3 = lv.line(scr)
-        line_top3.set_points(p_top_close, len(p_top_close))
-        line_top3.set_style_line_color(lv.color_hex(0xFFFF00), 0)
-        line_top3.set_style_line_width(2, 0)
-        
-        p_bot_left = [
-            lv.point_precise_t({'x': 160, 'y': 120}),
-            lv.point_precise_t({'x': 140, 'y': 150}),
-        ]
-        line_bot1 = lv.line(scr)
-        line_bot1.set_points(p_bot_left, len(p_bot_left))
-        line_bot1.set_style_line_color(lv.color_hex(0xFFFF00), 0)
-        line_bot1.set_style_line_width(2, 0)
-        
-        p_bot_right = [
-            lv.point_precise_t({'x': 140, 'y': 150}),
-            lv.point_precise_t({'x': 180, 'y': 150}),
-        ]
-        line_bot2 = lv.line(scr)
-        line_bot2.set_points(p_bot_right, len(p_bot_right))
-        line_bot2.set_style_line_color(lv.color_hex(0xFFFF00), 0)
-        line_bot2.set_style_line_width(2, 0)
+        # Draw hourglass outline
+        line_outline = lv.line(scr)
+        line_outline.set_points(_LOADER_OUTLINE_POINTS, len(_LOADER_OUTLINE_POINTS))
+        line_outline.set_style_line_color(lv.color_hex(0xFFFF00), 0)
+        line_outline.set_style_line_width(2, 0)
         
-        p_bot_close = [
-            lv.point_precise_t({'x': 180, 'y': 150}),
-            lv.point_precise_t({'x': 160, 'y': 120}),
-        ]
-        line_bot3 = lv.line(scr)
-        line_bot3.set_points(p_bot_close, len(p_bot_close))
-        line_bot3.set_style_line_color(lv.color_hex(0xFFFF00), 0)
-        line_bot3.set_style_line_width(2, 0)
-        
-        center_points = [
-            lv.point_precise_t({'x': 160, 'y': 118}),
-            lv.point_precise_t({'x': 160, 'y': 122}),
-        ]
         line_center = lv.line(scr)
-        line_center.set_points(center_points, len(center_points))
+        line_center.set_points(_LOADER_CENTER_POINTS, len(_LOADER_CENTER_POINTS))
         line_center.set_style_line_color(lv.color_hex(0xFFFF00), 0)
         line_center.set_style_line_width(3, 0)
         
@@ -353,25 +370,45 @@ def show_loader(message="Loading..."):
 # ============================================================================
 # OTA SETUP (Both modes)
 # ============================================================================
-def setup(updater, wifi):
+async def setup(updater, wifi):
     """Connect to WiFi and check for OTA updates."""
-    wifi.active(True)
-
     # Give the user a moment after reset to hold the BOOT button.
     # BOOT button on ESP32-S3 is typically active-low on GPIO0.
     show_loader("Hold BOOT for OTA...")
-    time.sleep(0.75)
 
     def _boot_button_held():
         try:
-            boot_pin = Pin(int(config.PIN_BOOT_BUTTON), Pin.IN, Pin.PULL_UP)
+            boot_pin = _get_pin(int(config.PIN_BOOT_BUTTON), Pin.IN, Pin.PULL_UP)
         except Exception:
-            boot_pin = Pin(int(config.PIN_BOOT_BUTTON), Pin.IN)
+            boot_pin = _get_pin(int(config.PIN_BOOT_BUTTON), Pin.IN)
         return boot_pin.value() == 0
 
+    async def _poll_boot_button(window_ms, settle_ms=50):
+        # True as soon as BOOT has read low continuously for settle_ms;
+        # False once the prompt has been on screen for window_ms, or as soon
+        # as the display gives up and the badge boots headless
+        low_since = None
+        while True:
+            now = _since_boot_ms()
+            if _boot_button_held():
+                if low_since is None:
+                    low_since = now
+                if now - low_since >= settle_ms:
+                    return True
+            else:
+                low_since = None
+            if _display_ready.is_set() and (
+                _HEADLESS_MODE or now - _display_ready_ms >= window_ms
+            ):
+                return False
+            await asyncio.sleep(0.01)
+
     try:
-        # Check if OTA was requested via boot button 
-        ota_requested = _boot_button_held()
+        # Check if OTA was requested via boot button. Polling starts while
+        # init_display() is still bringing the panel up, so a button held
+        # through reset is caught after the 50ms settle; the window then
+        # stays open for 750ms once the prompt is actually on screen.
+        ota_requested = await _poll_boot_button(750)
         logger.info(
             f"[OTA-WIFI] boot={_since_boot_ms()}ms ota_requested={ota_requested}"
         )
@@ -381,86 +418,91 @@ def setup(updater, wifi):
             # but still allow the fallback below to revert an interrupted update (if any).
             raise RuntimeError("OTA not requested")
 
+        # The scan/connect/OTA below block the event loop, so let the panel
+        # finish coming up first or "Updating..." is never drawn.
+        # init_display() sets this on failure too.
+        await _display_ready.wait()
+
+        # Only power up the radio once we know OTA is wanted. It stays up
+        # across attempts (disconnect only) and is shut off in boot cleanup.
+        wifi.active(True)
+
         connect_timeout_ms = int(getattr(config, "OTA_WIFI_TIMEOUT_S", 15) * 1000)
         max_attempts = int(getattr(config, "OTA_WIFI_MAX_ATTEMPTS", 2))
         scan_before = bool(getattr(config, "OTA_WIFI_SCAN_BEFORE_CONNECT", True))
         saved_fail_limit = int(getattr(config, "OTA_SAVED_FAIL_LIMIT", 3))
 
-        def _attempt_connect(ssid, password, label, allow_scan=True):
+        async def _attempt_connect(ssid, password, label, allow_scan=True):
             if not ssid:
                 return False
-            for attempt in range(1, max_attempts + 1):
+            # Go straight to the AP this SSID last associated with (no scan);
+            # if that directed attempt fails, the usual attempts follow
+            cached_bssid = _load_cached_bssid(ssid)
+            attempts = max_attempts + 1 if cached_bssid else max_attempts
+            for attempt in range(1, attempts + 1):
+                directed = cached_bssid is not None and attempt == 1
+                seen_bssid = cached_bssid if directed else None
                 show_loader("Connecting {} WiFi...".format(label))
                 _log_wifi_state("STA_CONNECTING", wifi, attempt=attempt, ssid=ssid)
-                if allow_scan and scan_before:
+                if not directed and allow_scan and scan_before:
                     found = _scan_for_ssid(wifi, ssid)
                     if found is False:
                         _log_wifi_state("STA_SCAN_NO_AP", wifi, attempt=attempt, ssid=ssid)
-                        try:
-                            wifi.disconnect()
-                        except Exception:
-                            pass
-                        try:
-                            wifi.active(False)
-                        except Exception:
-                            pass
+                        _silent(wifi.disconnect)
                         return False
+                    if found:
+                        seen_bssid = found[1]
                 try:
-                    wifi.active(True)
+                    kwargs = {"bssid": cached_bssid} if directed else {}
                     if password:
-                        wifi.connect(ssid, password)
+                        wifi.connect(ssid, password, **kwargs)
                     else:
-                        wifi.connect(ssid)
+                        wifi.connect(ssid, **kwargs)
                 except Exception as e:
                     logger.warning(f"[OTA-WIFI] connect error ({label}): {e}")
+                    if directed:
+                        _save_cached_bssid(ssid, None)
+                        continue
                     return False
 
                 start_ms = _since_boot_ms()
                 last_status = None
                 while (_since_boot_ms() - start_ms) < connect_timeout_ms:
-                    status = _safe_status(wifi)
+                    status = _silent(wifi.status)
                     if status != last_status:
                         _log_wifi_state("STA_STATUS", wifi, status=status, attempt=attempt, ssid=ssid)
                         last_status = status
                     if status in (STAT_WRONG_PASSWORD, STAT_CONNECT_FAIL, STAT_NO_AP_FOUND):
                         _log_wifi_state("STA_STATUS_FAIL", wifi, status=status, attempt=attempt, ssid=ssid)
-                        try:
-                            wifi.disconnect()
-                        except Exception:
-                            pass
-                        try:
-                            wifi.active(False)
-                        except Exception:
-                            pass
+                        _silent(wifi.disconnect)
+                        if directed:
+                            _save_cached_bssid(ssid, None)
+                            break
                         return False
-                    if status == STAT_GOT_IP:
+                    up = status == STAT_GOT_IP
+                    if not up:
+                        up = _silent(wifi.isconnected)
+                    if up:
                         _log_wifi_state("STA_GOT_IP", wifi, status=status, attempt=attempt, ssid=ssid)
+                        # Look the AP up (possibly a blocking scan) only to
+                        # seed an empty cache, not after every connect
+                        if not seen_bssid and cached_bssid is None:
+                            seen_bssid = _connected_bssid(wifi, ssid)
+                        if seen_bssid:
+                            _save_cached_bssid(ssid, seen_bssid)
                         return True
-                    try:
-                        if wifi.isconnected():
-                            _log_wifi_state("STA_GOT_IP", wifi, status=status, attempt=attempt, ssid=ssid)
-                            return True
-                    except Exception:
-                        pass
-                    time.sleep(0.25)
-
-                _log_wifi_state("STA_TIMEOUT", wifi, status=last_status, attempt=attempt, ssid=ssid)
-                try:
-                    wifi.disconnect()
-                except Exception:
-                    pass
-                try:
-                    wifi.active(False)
-                except Exception:
-                    pass
-                time.sleep(0.2)
+                    await asyncio.sleep(0.25)
+                else:
+                    _log_wifi_state("STA_TIMEOUT", wifi, status=last_status, attempt=attempt, ssid=ssid)
+                    _silent(wifi.disconnect)
+                    if directed:
+                        # That AP is gone or moved: don't pay this timeout
+                        # again on the next OTA boot
+                        _save_cached_bssid(ssid, None)
+                await asyncio.sleep(0.2)
             return False
 
-        connected = False
-        try:
-            connected = wifi.isconnected()
-        except Exception:
-            connected = False
+        connected = bool(_silent(wifi.isconnected))
 
         if not connected:
             saved_ssid, saved_pass = load_saved_credentials()
@@ -471,14 +513,14 @@ def setup(updater, wifi):
                         f"[OTA-WIFI] saved creds skipped (failures={saved_failures} limit={saved_fail_limit})"
                     )
                 else:
-                    connected = _attempt_connect(saved_ssid, saved_pass, "saved", allow_scan=True)
+                    connected = await _attempt_connect(saved_ssid, saved_pass, "saved", allow_scan=True)
                     if connected:
                         reset_saved_failure()
                     else:
                         increment_saved_failure()
 
             if not connected:
-                connected = _attempt_connect(OTA_WIFI_SSID, OTA_WIFI_PASSWORD, "OTA", allow_scan=False)
+                connected = await _attempt_connect(OTA_WIFI_SSID, OTA_WIFI_PASSWORD, "OTA", allow_scan=False)
 
         if connected:
             show_loader("Updating...")
@@ -512,7 +554,56 @@ updater = OTAUpdater(
 # Minimal WiFi setup
 wifi = network.WLAN(network.WLAN.IF_STA)
 
-if not _HEADLESS_MODE:
+async def init_display():
+    """Bring up the SPI bus, ILI9341 panel and LVGL task handler.
+
+    Runs alongside setup() so the panel's reset/init settle delays overlap
+    with the BOOT window. Any failure boots on headless instead of escaping
+    asyncio.run() and skipping the OTA/Wi-Fi cleanup.
+    """
+    global display_bus, _HEADLESS_MODE
+    try:
+        await _bring_up_display()
+    except Exception as e:
+        logger.error(f"Display initialization failed: {e} - continuing headless")
+        try:
+            if display_bus:
+                display_bus.deinit()
+        except Exception as deinit_e:
+            logger.error(f"Display bus release failed: {deinit_e}")
+        display_bus = None
+        _HEADLESS_MODE = True
+        # Release setup() if it is waiting for the loader to appear
+        _display_ready.set()
+
+
+async def _bring_up_display():
+    global display_bus, spi_bus, display, th, lv, _display_ready_ms
+    global _LOADER_OUTLINE_POINTS, _LOADER_CENTER_POINTS
+
+    # The graphics stack is only imported here, so headless boots and a
+    # failed bring-up never load the LVGL bindings
+    import lvgl as lv
+    lv.init()
+
+    import lcd_bus
+    import ili9341
+    import task_handler
+
+    # Loader hourglass geometry, built once. lv_line keeps a pointer to its
+    # points rather than a copy, so these must stay alive. The outline is
+    # one closed polyline (both triangles meet at the waist) so it costs a
+    # single line widget.
+    _LOADER_OUTLINE_POINTS = [
+        lv.point_precise_t({'x': x, 'y': y})
+        for x, y in ((140, 90), (180, 90), (160, 120), (140, 150),
+                     (180, 150), (160, 120), (140, 90))
+    ]
+    _LOADER_CENTER_POINTS = [
+        lv.point_precise_t({'x': 160, 'y': 118}),
+        lv.point_precise_t({'x': 160, 'y': 122}),
+    ]
+
     # Hardware Configuration - use centralized pin definitions
     # Explicitly convert to int to handle soft reboot edge cases where
     # module state may be corrupted
@@ -523,37 +614,47 @@ if not _HEADLESS_MODE:
     PIN_TFT_SCK = int(config.PIN_TFT_SCK)
     PIN_TFT_LED = int(config.PIN_TFT_LED)
 
-    # Clean up any residual SPI bus state from soft reboot
-    # This prevents "can't convert str to int" errors when SPI bus has stale state
-    try:
-        # Try to deinit any existing display_bus if it exists in globals
-        _old_bus = globals().get('display_bus')
-        if _old_bus:
-            _old_bus.deinit()
-            del _old_bus
-        spi_bus = machine.SPI.Bus(host=1, mosi=PIN_TFT_MOSI, sck=PIN_TFT_SCK)
-    except Exception as e:
-        # Pulse the TFT reset pin to ensure clean state before retrying SPI bus creation
-        try:
-            reset_pin = Pin(int(config.PIN_TFT_RESET), Pin.OUT)
-            reset_pin.value(0)
-            time.sleep(0.1)
-            reset_pin.value(1)
-            time.sleep(0.1)
-        except Exception as reset_e:
-            logger.error(f"TFT reset pulse failed: {reset_e}")
+    # A soft reboot can leave the SPI host with stale state that fails the
+    # first bus creation, so retry once after letting it settle. The bus
+    # objects from the previous run are gone by now (display_bus starts as
+    # None), so there is nothing of ours left to deinit first.
+    spi_bus = None
+    for attempt in range(2):
         try:
             spi_bus = machine.SPI.Bus(host=1, mosi=PIN_TFT_MOSI, sck=PIN_TFT_SCK)
+            break
         except Exception as spi_e:
-            logger.error(f"SPI bus initialization failed: {spi_e}")
-            time.sleep(1)
-            machine.reset()
+            if attempt:
+                # Boot on without a display rather than resetting the whole
+                # badge (handled in init_display())
+                raise
+            logger.warning(f"SPI bus initialization failed: {spi_e} - retrying")
+            await asyncio.sleep(0.1)
 
     display_bus = lcd_bus.SPIBus(spi_bus=spi_bus, freq=40000000, dc=PIN_TFT_DC, cs=PIN_TFT_CS)
+
+    # Left alone, the driver takes its draw buffer (1/10 of the screen,
+    # RGB565) from internal DMA-capable SRAM. Put it in PSRAM when the
+    # probe above found some, so internal RAM stays free for Wi-Fi/stacks.
+    # It must still be DMA-capable PSRAM: otherwise the SPI master copies
+    # every flush through a temporary internal bounce buffer.
+    frame_buffer = None
+    if _PSRAM_AVAILABLE and hasattr(lcd_bus, "MEMORY_SPIRAM"):
+        try:
+            frame_buffer = display_bus.allocate_framebuffer(
+                config.DISPLAY_WIDTH * config.DISPLAY_HEIGHT * 2 // 10,
+                lcd_bus.MEMORY_SPIRAM | lcd_bus.MEMORY_DMA,
+            )
+            logger.info(f"[PSRAM] Display buffer in PSRAM: {len(frame_buffer)} bytes")
+        except Exception as e:
+            logger.warning(f"[PSRAM] Display buffer allocation failed: {e}")
+            frame_buffer = None
+
     display = ili9341.ILI9341(
         data_bus=display_bus,
         display_width=config.DISPLAY_HEIGHT,
         display_height=config.DISPLAY_WIDTH,
+        frame_buffer1=frame_buffer,
         backlight_pin=PIN_TFT_LED,
         color_space=lv.COLOR_FORMAT.RGB565,
         color_byte_order=ili9341.BYTE_ORDER_BGR,
@@ -561,35 +662,46 @@ if not _HEADLESS_MODE:
     )
 
     # Hardware reset pulse to ensure clean display state
-    reset_pin = Pin(PIN_TFT_RESET, Pin.OUT)
+    reset_pin = _get_pin(PIN_TFT_RESET, Pin.OUT)
     reset_pin.value(0)
-    time.sleep(0.1)
+    await asyncio.sleep(0.1)
     reset_pin.value(1)
-    time.sleep(0.5)  # Wait for display to stabilize after reset
+    await asyncio.sleep(0.5)  # Wait for display to stabilize after reset
 
     display.set_power(True)
     display.init(1)
-    time.sleep(0.3)  # Wait for display init to complete
+    await asyncio.sleep(0.3)  # Wait for display init to complete
     display.set_color_inversion(True)  # Fix color inversion in LVGL 9.4 binding
     display.set_rotation(lv.DISPLAY_ROTATION._90)  # 90 degrees
     display.set_backlight(100)
 
     # Start LVGL task handler so the display gets updated
     th = task_handler.TaskHandler()
-    time.sleep(0.2)  # Give task handler time to start
+    await asyncio.sleep(0.2)  # Give task handler time to start
+
+    # Draw whatever setup() last asked for while the panel was coming up
+    _display_ready_ms = _since_boot_ms()
+    _display_ready.set()
+    show_loader(_pending_loader_message)
 
-    # ============================================================================
-    # BOOT SEQUENCE (Both modes)
-    # ============================================================================
-    show_loader()
-    time.sleep(0.2)
 
+async def _run_setup():
     # Run OTA setup - always continue even if this fails
     try:
-        setup(updater=updater, wifi=wifi)
+        await setup(updater=updater, wifi=wifi)
     except Exception as e:
         logger.error(f"Setup failed: {e}")
 
+
+if not _HEADLESS_MODE:
+    # ============================================================================
+    # BOOT SEQUENCE (Both modes)
+    # ============================================================================
+    async def _boot():
+        await asyncio.gather(init_display(), _run_setup())
+
+    asyncio.run(_boot())
+
     # Cleanup OTA resources - don't let failures block boot
     try:
         show_loader("Cleaning up...")
@@ -605,7 +717,8 @@ if not _HEADLESS_MODE:
 
     # Cleanup WiFi - don't let failures block boot
     try:
-        if wifi:
+        # Radio is only started when OTA was requested
+        if wifi and wifi.active():
             wifi.disconnect()
             wifi.active(False)
     except Exception as e:
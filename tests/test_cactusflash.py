@@ -0,0 +1,169 @@
+import time
+import unittest
+
+from cactusflash import RAW_PASTE_WINDOW, exec_raw_paste, parse_status, wait_for
+
+
+class FakeSerial:
+    """Serial stand-in that hands out queued bytes, one arrival per read."""
+
+    def __init__(self, *arrivals):
+        self.timeout = 1
+        self.arrivals = [bytearray(a) for a in arrivals]
+        self.written = bytearray()
+
+    @property
+    def in_waiting(self):
+        return sum(len(a) for a in self.arrivals)
+
+    def queue(self, data):
+        self.arrivals.append(bytearray(data))
+
+    def read(self, n=1):
+        # Like a real port, one read() never spans two separate arrivals
+        while self.arrivals and not self.arrivals[0]:
+            self.arrivals.pop(0)
+        if not self.arrivals:
+            return b""
+        head = self.arrivals[0]
+        data = bytes(head[:n])
+        del head[:n]
+        return data
+
+    def write(self, data):
+        self.written.extend(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def unread(self):
+        return b"".join(bytes(a) for a in self.arrivals)
+
+
+class ChattySerial(FakeSerial):
+    """Keeps printing log output that never contains the marker.
+
+    Goes quiet after a few seconds so a per-read timeout fails the test
+    instead of hanging it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.quiet_at = time.monotonic() + 3
+
+    def read(self, n=1):
+        time.sleep(min(0.01, self.timeout))
+        if time.monotonic() > self.quiet_at:
+            return b""
+        return b"log line\r\n"[:n]
+
+
+class WaitForTest(unittest.TestCase):
+    def test_marker_split_across_reads(self):
+        ser = FakeSerial(b"boot\r\nPAT", b"CH_DO", b"NE\r\nmore")
+        self.assertEqual(wait_for(ser, b"PATCH_DONE", timeout=1), b"boot\r\nPATCH_DONE")
+
+    def test_bytes_after_marker_are_left_unread(self):
+        ser = FakeSerial(b"OK\x04\x04>raw REPL", b"; CTRL-B")
+        self.assertEqual(wait_for(ser, b"\x04>", timeout=1), b"OK\x04\x04>")
+        self.assertEqual(ser.unread(), b"raw REPL; CTRL-B")
+
+    def test_partial_match_restarts(self):
+        ser = FakeSerial(b"PATCH_PATCH_DONE!")
+        self.assertEqual(wait_for(ser, b"PATCH_DONE", timeout=1), b"PATCH_PATCH_DONE")
+        self.assertEqual(ser.unread(), b"!")
+
+    def test_returns_what_arrived_when_port_goes_quiet(self):
+        ser = FakeSerial(b"partial PATCH")
+        self.assertEqual(wait_for(ser, b"PATCH_DONE", timeout=1), b"partial PATCH")
+
+    def test_timeout_is_an_overall_deadline(self):
+        ser = ChattySerial()
+        start = time.monotonic()
+        resp = wait_for(ser, b"PATCH_DONE", timeout=0.2)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertTrue(resp)
+        self.assertNotIn(b"PATCH_DONE", resp)
+
+    def test_restores_port_timeout(self):
+        ser = FakeSerial(b"x")
+        ser.timeout = 7
+        wait_for(ser, b"x", timeout=1)
+        self.assertEqual(ser.timeout, 7)
+
+
+class RawPasteBadge(FakeSerial):
+    """Raw-paste receiver that hands out one window of credit at a time."""
+
+    def __init__(self, window, abort_after=None):
+        super().__init__()
+        self.window = window
+        self.abort_after = abort_after
+        self.credit = 0
+        self.received = bytearray()
+        self.overrun = False
+        self.pasting = False
+
+    def write(self, data):
+        super().write(data)
+        if not self.pasting:
+            if data == b"\x05A\x01":
+                self.pasting = True
+                self.credit = self.window
+                self.queue(b"R\x01" + RAW_PASTE_WINDOW.pack(self.window))
+            return len(data)
+        if data == b"\x04":
+            self.pasting = False
+            self.queue(b"\x04")
+            return len(data)
+        if len(data) > self.credit:
+            self.overrun = True
+        self.credit -= len(data)
+        self.received.extend(data)
+        if self.abort_after is not None and len(self.received) >= self.abort_after:
+            self.queue(b"\x04")
+        elif self.credit == 0:
+            self.credit += self.window
+            self.queue(b"\x01")
+        return len(data)
+
+
+class ExecRawPasteTest(unittest.TestCase):
+    def test_stays_within_flow_control_window(self):
+        script = "print('hello')\r\n" * 5  # not a multiple of the window
+        ser = RawPasteBadge(window=8)
+        self.assertTrue(exec_raw_paste(ser, script))
+        self.assertFalse(ser.overrun)
+        self.assertEqual(bytes(ser.received), script.encode())
+        self.assertTrue(ser.written.endswith(b"\x04"))
+
+    def test_badge_abort_is_acknowledged(self):
+        ser = RawPasteBadge(window=8, abort_after=8)
+        self.assertFalse(exec_raw_paste(ser, "x = 1\r\n" * 10))
+        self.assertEqual(len(ser.received), 8)
+        self.assertTrue(ser.written.endswith(b"\x04"))
+
+    def test_plain_raw_repl_fallback(self):
+        ser = FakeSerial(b"R\x00", b"OK")
+        self.assertTrue(exec_raw_paste(ser, "x = 1\r\n"))
+        self.assertEqual(bytes(ser.written), b"\x05A\x01x = 1\r\n\x04")
+
+
+class ParseStatusTest(unittest.TestCase):
+    def test_last_status_line_wins(self):
+        text = "STATUS:3\r\nboot\r\nSTATUS:0\r\nPATCH_DONE\r\n"
+        self.assertEqual(parse_status(text), 0)
+
+    def test_error_count(self):
+        self.assertEqual(parse_status("write err: x\nSTATUS:2\n"), 2)
+
+    def test_no_status_line_leading_digit(self):
+        self.assertIsNone(parse_status("3 chars found\r\nPATCH_DONE\r\n"))
+
+    def test_status_without_number(self):
+        self.assertIsNone(parse_status("STATUS:\r\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+
+from mpy_disasm import DISASM_BANNER, DisassemblySplitter, UniversalNewlineWriter  # noqa: E402
+
+
+def universal_newlines(text):
+    """What subprocess.run(text=True) made of the same output."""
+    return io.TextIOWrapper(io.BytesIO(text.encode()), encoding="utf-8", newline=None).read()
+
+
+def write_in_pieces(stream, text, cuts):
+    start = 0
+    for cut in list(cuts) + [len(text)]:
+        stream.write(text[start:cut])
+        start = cut
+
+
+class UniversalNewlineWriterTest(unittest.TestCase):
+    def translate(self, *pieces):
+        out = io.StringIO()
+        writer = UniversalNewlineWriter(out)
+        for piece in pieces:
+            writer.write(piece)
+        return out.getvalue()
+
+    def test_crlf_and_lone_cr(self):
+        self.assertEqual(self.translate("a\r\nb\rc\n"), "a\nb\nc\n")
+
+    def test_crlf_split_across_writes(self):
+        self.assertEqual(self.translate("a\r", "\nb"), "a\nb")
+
+    def test_lone_cr_at_end_of_write(self):
+        self.assertEqual(self.translate("a\r", "b"), "a\nb")
+
+    def test_cr_then_crlf_is_two_line_breaks(self):
+        self.assertEqual(self.translate("a\r", "\r\n", "b"), "a\n\nb")
+
+    def test_empty_write_keeps_pending_cr(self):
+        self.assertEqual(self.translate("a\r", "", "\nb"), "a\nb")
+
+    def test_returns_characters_consumed(self):
+        writer = UniversalNewlineWriter(io.StringIO())
+        self.assertEqual(writer.write("a\r\n"), 3)
+
+    def test_matches_subprocess_text_mode_at_every_split(self):
+        # qstrs can hold a bare "\r", so every mix must agree with what the
+        # old subprocess path produced, wherever print() splits the writes
+        text = "qstr 'a\rb'\r\nline\n\r\r\nend\r"
+        expected = universal_newlines(text)
+        for i in range(len(text) + 1):
+            for j in range(i, len(text) + 1):
+                out = io.StringIO()
+                write_in_pieces(UniversalNewlineWriter(out), text, (i, j))
+                self.assertEqual(out.getvalue(), expected, (i, j))
+
+
+class DisassemblySplitterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.dsts = {"dump/a.mpy": root / "a.dis.txt", "dump/b.mpy": root / "b.dis.txt"}
+        self.module_a = f"{DISASM_BANNER}dump/a.mpy\nheader a\n  bytecode a\n\n"
+        self.module_b = f"{DISASM_BANNER}dump/b.mpy\nheader b\n  bytecode b\n"
+
+    def split(self, text, cuts=()):
+        with DisassemblySplitter(self.dsts) as splitter:
+            write_in_pieces(splitter, text, cuts)
+        return splitter
+
+    def test_routes_each_module_to_its_file(self):
+        splitter = self.split(self.module_a + self.module_b)
+        self.assertTrue(splitter.complete())
+        self.assertEqual(self.dsts["dump/a.mpy"].read_text(encoding="utf-8"), self.module_a)
+        self.assertEqual(self.dsts["dump/b.mpy"].read_text(encoding="utf-8"), self.module_b)
+
+    def test_same_files_whatever_the_write_boundaries(self):
+        text = self.module_a + self.module_b
+        for cut in range(len(text) + 1):
+            splitter = self.split(text, (cut,))
+            self.assertTrue(splitter.complete(), cut)
+            self.assertEqual(self.dsts["dump/a.mpy"].read_text(encoding="utf-8"), self.module_a, cut)
+            self.assertEqual(self.dsts["dump/b.mpy"].read_text(encoding="utf-8"), self.module_b, cut)
+
+    def test_unterminated_last_line_is_flushed_on_close(self):
+        self.split(self.module_a + self.module_b + "tail")
+        self.assertEqual(
+            self.dsts["dump/b.mpy"].read_text(encoding="utf-8"), self.module_b + "tail"
+        )
+
+    def test_output_before_first_banner_is_incomplete(self):
+        splitter = self.split("warning: something\n" + self.module_a + self.module_b)
+        self.assertFalse(splitter.complete())
+
+    def test_missing_module_is_incomplete(self):
+        self.assertFalse(self.split(self.module_a).complete())
+
+    def test_repeated_banner_is_incomplete(self):
+        self.assertFalse(self.split(self.module_a + self.module_a + self.module_b).complete())
+
+    def test_unknown_banner_is_incomplete_and_not_appended(self):
+        stray = f"{DISASM_BANNER}dump/c.mpy\nheader c\n"
+        splitter = self.split(self.module_a + stray + self.module_b)
+        self.assertFalse(splitter.complete())
+        self.assertEqual(self.dsts["dump/a.mpy"].read_text(encoding="utf-8"), self.module_a)
+
+
+if __name__ == "__main__":
+    unittest.main()
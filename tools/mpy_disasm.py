@@ -11,20 +11,146 @@ single-file disassembly, hex dumps, header inspection, and batch processing.
 """
 
 import argparse
+import contextlib
+import importlib.util
+import io
+import os
 import subprocess
 import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from types import ModuleType
+from typing import Optional, TextIO
 
 MPY_TOOL = Path(__file__).resolve().parent / "vendor" / "mpy-tool.py"
-
-
-def run_mpy_tool(args: list[str]) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        [sys.executable, str(MPY_TOOL)] + args,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
+_mpy_tool: Optional[ModuleType] = None
+
+# First line mpy-tool prints for each module it disassembles
+DISASM_BANNER = "mpy_source_file: "
+
+
+def _load_mpy_tool() -> ModuleType:
+    """Import the vendored mpy-tool.py once per process."""
+    global _mpy_tool
+    if _mpy_tool is None:
+        # Run as a script, mpy-tool finds makeqstrdata via sys.path[0]/../py
+        sys.path.append(str(MPY_TOOL.parent.parent / "py"))
+        spec = importlib.util.spec_from_file_location("mpy_tool", MPY_TOOL)
+        _mpy_tool = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_mpy_tool)
+    return _mpy_tool
+
+
+class UniversalNewlineWriter(io.TextIOBase):
+    """Write-through text stream that turns "\r\n" and lone "\r" into "\n".
+
+    This is the translation subprocess text=True used to apply. A "\r"
+    inside a printed qstr comes out as a line break, not a raw carriage
+    return.
+    """
+
+    def __init__(self, target: TextIO):
+        self.target = target
+        self._pending_cr = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if not s:
+            return 0
+        text = s
+        if self._pending_cr and text.startswith("\n"):
+            text = text[1:]
+        self._pending_cr = text.endswith("\r")
+        self.target.write(text.replace("\r\n", "\n").replace("\r", "\n"))
+        return len(s)
+
+
+def run_mpy_tool(args: list[str], out: Optional[TextIO] = None) -> subprocess.CompletedProcess:
+    """Run mpy-tool in this process, capturing output like subprocess.run.
+
+    Output (stdout and stderr, merged) is collected into ``.stdout``, or
+    streamed to ``out`` as it is printed when one is given.
+
+    mpy-tool keeps its state in module globals and prints to sys.stdout,
+    so calls must not overlap within one process.
+    """
+    tool = _load_mpy_tool()
+    buf = io.StringIO() if out is None else None
+    sink = UniversalNewlineWriter(buf if out is None else out)
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        try:
+            tool.main(args)
+            returncode = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                returncode = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except Exception:
+            traceback.print_exc()
+            returncode = 1
+    output = buf.getvalue() if buf is not None else None
+    return subprocess.CompletedProcess([str(MPY_TOOL)] + args, returncode, output)
+
+
+class DisassemblySplitter(io.TextIOBase):
+    """Route one multi-file ``mpy-tool -d`` run into per-file outputs.
+
+    Each module's text starts with a DISASM_BANNER line naming its source;
+    lines are written to that module's destination as they arrive. Check
+    ``complete()`` afterwards: anything before the first banner, an
+    unknown or repeated banner, or a missing file means the caller should
+    fall back to one run per file.
+    """
+
+    def __init__(self, dsts: dict[str, Path]):
+        self.dsts = dsts
+        self.written: set[str] = set()
+        self.stray = False
+        self._partial = ""
+        self._fp: Optional[TextIO] = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        *lines, self._partial = (self._partial + s).split("\n")
+        for line in lines:
+            self._write_line(line + "\n")
+        return len(s)
+
+    def _write_line(self, line: str) -> None:
+        if line.startswith(DISASM_BANNER):
+            name = line[len(DISASM_BANNER):].rstrip("\n")
+            self._close_current()
+            if name not in self.dsts or name in self.written:
+                self.stray = True
+                return
+            self.written.add(name)
+            self._fp = open(self.dsts[name], "w", encoding="utf-8")
+        elif self._fp is None:
+            self.stray = True
+            return
+        self._fp.write(line)
+
+    def _close_current(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def close(self) -> None:
+        if self._partial:
+            self._write_line(self._partial)
+            self._partial = ""
+        self._close_current()
+        super().close()
+
+    def complete(self) -> bool:
+        return not self.stray and self.written == set(self.dsts)
 
 
 def cmd_disasm(args: argparse.Namespace) -> int:
@@ -79,6 +205,12 @@ def cmd_info(args: argparse.Namespace) -> int:
     return 0
 
 
+def batch_one(job: tuple[Path, Path, list[str]]) -> tuple[Path, int]:
+    src, dst, flags = job
+    with open(dst, "w", encoding="utf-8") as f:
+        return src, run_mpy_tool(flags + [str(src)], out=f).returncode
+
+
 def cmd_batch(args: argparse.Namespace) -> int:
     root = Path(args.files[0])
     if not root.is_dir():
@@ -92,34 +224,67 @@ def cmd_batch(args: argparse.Namespace) -> int:
     if args.json:
         flags.append("-j")
 
-    mpy_files = sorted(root.rglob("*.mpy"))
-    if not mpy_files:
+    def dst_for(src: Path) -> Path:
+        dst = out_dir / src.relative_to(root).with_suffix(".dis.txt")
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        return dst
+
+    # Text output: disassemble the whole tree in one mpy-tool run, which
+    # needs the full file list up front, streaming each module's text
+    # straight into its .dis.txt. A run that fails (one unreadable file
+    # aborts all) falls back to one run per file so failures are reported
+    # individually. JSON output is a single document that can't be split,
+    # so it goes straight to per-file runs fed from the directory walk as
+    # it proceeds.
+    if args.json:
+        mpy_files = root.rglob("*.mpy")
+        combined = False
+    else:
+        mpy_files = sorted(root.rglob("*.mpy"))
+        combined = False
+        if mpy_files:
+            dsts = {str(src): dst_for(src) for src in mpy_files}
+            with DisassemblySplitter(dsts) as splitter:
+                proc = run_mpy_tool(flags + list(dsts), out=splitter)
+            combined = proc.returncode == 0 and splitter.complete()
+
+    # Per-file runs go to worker processes: mpy-tool runs in-process and is
+    # not reentrant, and each worker only loads it once. map() still yields
+    # results in submission order.
+    if combined:
+        pool = None
+        results = ((src, 0) for src in mpy_files)
+    else:
+        pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        results = pool.map(batch_one, ((src, dst_for(src), flags) for src in mpy_files))
+    total = 0
+    failures = []
+    try:
+        for src, returncode in results:
+            total += 1
+            rel = src.relative_to(root)
+            status = "OK" if returncode == 0 else "FAIL"
+            print(f"  {status}  {rel}")
+            if returncode != 0:
+                failures.append(str(rel))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if not total:
         sys.stderr.write(f"error: no .mpy files found in {root}\n")
         return 1
 
-    failures = []
-    for src in mpy_files:
-        rel = src.relative_to(root)
-        dst = out_dir / rel.with_suffix(".dis.txt")
-        dst.parent.mkdir(parents=True, exist_ok=True)
-
-        proc = run_mpy_tool(flags + [str(src)])
-        dst.write_text(proc.stdout, encoding="utf-8")
-
-        status = "OK" if proc.returncode == 0 else "FAIL"
-        print(f"  {status}  {rel}")
-        if proc.returncode != 0:
-            failures.append(str(rel))
-
     summary_lines = [
         f"root: {root}",
-        f"total_mpy: {len(mpy_files)}",
-        f"passed: {len(mpy_files) - len(failures)}",
+        f"total_mpy: {total}",
+        f"passed: {total - len(failures)}",
         f"failures: {len(failures)}",
     ]
     if failures:
         summary_lines.append("failed:")
-        summary_lines.extend(f"  {f}" for f in failures)
+        # Sorted: JSON batches report in directory-walk order
+        summary_lines.extend(f"  {f}" for f in sorted(failures))
     else:
         summary_lines.append("failed: none")
 
@@ -130,7 +295,7 @@ def cmd_batch(args: argparse.Namespace) -> int:
     return 0
 
 
-def main() -> int:
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="mpy_disasm",
         description="Disassemble MicroPython .mpy bytecode files.",
@@ -168,6 +333,15 @@ examples:
     p_batch.add_argument("-o", "--output", help="output directory (default: disassembly/)")
     p_batch.add_argument("-j", "--json", action="store_true", help="JSON output")
 
+    return parser
+
+
+# Built once at import so library callers and completion generators can
+# reuse it without rebuilding the subcommand tree.
+_PARSER = _build_parser()
+
+
+def main() -> int:
     if not MPY_TOOL.exists():
         sys.stderr.write(f"error: vendored mpy-tool not found at {MPY_TOOL}\n")
         return 1
@@ -178,10 +352,10 @@ examples:
     if argv and argv[0] not in subcommands and not argv[0].startswith("-"):
         argv = ["disasm"] + argv
     elif not argv:
-        parser.print_help()
+        _PARSER.print_help()
         return 0
 
-    args = parser.parse_args(argv)
+    args = _PARSER.parse_args(argv)
 
     dispatch = {
         "disasm": cmd_disasm,